@@ -0,0 +1,148 @@
+"""Datetime normalization to the Vendit API format."""
+
+import re
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
+_UTC = timezone.utc
+
+# Datetimes already in the API format, e.g. "2025-08-18T13:35:51.885Z"
+# ASCII digits only: \d and int() would also accept e.g. Arabic-Indic digits
+_API_DATETIME_RE = re.compile(
+    r"[0-9]{4}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])"
+    r"T([01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]\.[0-9]{3}Z"
+)
+
+# Trailing Z or UTC offset such as +02:00 or -0500
+_TZ_TAIL_RE = re.compile(r"(?:[zZ]|[+-]\d{2}:?\d{2})$")
+
+# Last formatted current time as (epoch milliseconds, API datetime string)
+_last_now = (0, "")
+
+
+def _is_api_datetime(value):
+    """Return True if a string is a valid datetime already in the API format."""
+    # Constant-time length/suffix checks rule out most strings before the regex
+    if not (
+        len(value) == 24
+        and value[-1] == "Z"
+        and _API_DATETIME_RE.fullmatch(value) is not None
+    ):
+        return False
+    # The regex only checks field ranges, so it accepts e.g. February 30th
+    try:
+        datetime(int(value[:4]), int(value[5:7]), int(value[8:10]))
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_dt(value):
+    """Parse an ISO 8601 string, preferring the C parser from ciso8601.
+
+    Raises:
+        ValueError: If the string is not valid ISO 8601
+    """
+    if ciso8601 is not None:
+        try:
+            return ciso8601.parse_datetime(value)
+        except ValueError:
+            pass
+    # fromisoformat handles most ISO formats once Z is spelled as +00:00
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _fmt_ms(value):
+    """Format a naive UTC datetime as "YYYY-MM-DDTHH:MM:SS.mmmZ"."""
+    return (
+        f"{value.year:04d}-{value.month:02d}-{value.day:02d}"
+        f"T{value.hour:02d}:{value.minute:02d}:{value.second:02d}"
+        f".{value.microsecond // 1000:03d}Z"
+    )
+
+
+def now_iso_ms():
+    """Get the current UTC time as an API datetime string.
+
+    The string is reused for every call within the same millisecond.
+    """
+    global _last_now
+    ms = time.time_ns() // 1_000_000
+    if ms != _last_now[0]:
+        now = datetime.utcfromtimestamp(ms // 1000).replace(microsecond=ms % 1000 * 1000)
+        _last_now = (ms, _fmt_ms(now))
+    return _last_now[1]
+
+
+def datetime_to_iso_ms(value):
+    """Format a datetime as a UTC API datetime string."""
+    if value.tzinfo:
+        value = value.astimezone(_UTC).replace(tzinfo=None)
+    return _fmt_ms(value)
+
+
+@lru_cache(maxsize=4096)
+def normalize_iso_ms(raw):
+    """Normalize an ISO-like datetime string to the API format.
+
+    Results are cached because the same timestamp usually repeats across
+    the records of one import.
+
+    Raises:
+        ValueError: If the string cannot be parsed
+    """
+    if _is_api_datetime(raw):
+        return raw
+
+    try:
+        return datetime_to_iso_ms(_parse_dt(raw))
+    except ValueError:
+        pass
+
+    # Fallback: drop a trailing Z or UTC offset and parse the local time
+    dt_str = _TZ_TAIL_RE.sub('', raw.strip())
+    # Replace space with T if needed for ISO format
+    if ' ' in dt_str and 'T' not in dt_str:
+        dt_str = dt_str.replace(' ', 'T')
+    return _fmt_ms(datetime.fromisoformat(dt_str))
+
+
+def _from_datetime(value, logger):
+    """Normalize a datetime object."""
+    return datetime_to_iso_ms(value)
+
+
+def _from_str(value, logger):
+    """Normalize a datetime string, using the current time if it is invalid."""
+    try:
+        return normalize_iso_ms(value)
+    except ValueError as e:
+        logger.warning(f"Failed to parse creationDatetime '{value}': {e}, using current time")
+        return now_iso_ms()
+
+
+_DT_DISPATCH = {datetime: _from_datetime, str: _from_str}
+
+
+def normalize_creation_datetime(value, logger):
+    """Normalize a record's creation datetime to the API format.
+
+    Missing values and strings that cannot be parsed fall back to the
+    current time.
+    """
+    convert = _DT_DISPATCH.get(type(value))
+    if convert is not None:
+        return convert(value, logger)
+    # Subclasses (e.g. pendulum datetimes) miss the exact-type lookup
+    for cls, convert in _DT_DISPATCH.items():
+        if isinstance(value, cls):
+            return convert(value, logger)
+    if not value:
+        return now_iso_ms()
+    return value
@@ -0,0 +1,65 @@
+"""JSON helpers that use orjson when it is installed."""
+
+import json
+import math
+from decimal import Decimal
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj: Any) -> Any:
+    """Convert types the JSON encoders don't handle natively."""
+    # singer-sdk parses record floats as Decimal
+    if isinstance(obj, Decimal):
+        if not obj.is_finite():
+            raise ValueError(f"Out of range number is not JSON compliant: {obj}")
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _check_finite(obj: Any) -> None:
+    """Raise ValueError for NaN or infinite numbers, like json's allow_nan=False."""
+    if isinstance(obj, float):
+        if not math.isfinite(obj):
+            raise ValueError(f"Out of range float is not JSON compliant: {obj}")
+    elif isinstance(obj, Decimal):
+        if not obj.is_finite():
+            raise ValueError(f"Out of range number is not JSON compliant: {obj}")
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _check_finite(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _check_finite(value)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize an object to a UTF-8 encoded JSON document.
+
+    Raises:
+        TypeError: If the object contains a type that can't be serialized
+        ValueError: If the object contains NaN or infinite numbers
+    """
+    if orjson is not None:
+        body = orjson.dumps(obj, default=_default)
+        # orjson silently writes NaN and infinities as null, so only walk
+        # the payload to reject them like the stdlib does when one may be there
+        if b"null" in body:
+            _check_finite(obj)
+        return body
+    return json.dumps(obj, default=_default, allow_nan=False).encode("utf-8")
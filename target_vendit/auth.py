@@ -2,7 +2,9 @@
 
 import json
 import logging
-from typing import Dict, Optional
+import threading
+import time
+from typing import Dict, Optional, Tuple
 
 import requests
 from requests.exceptions import RequestException
@@ -13,15 +15,31 @@ logger = logging.getLogger(__name__)
 class VenditAuthenticator:
     """Handles authentication for Vendit API including OAuth token retrieval."""
 
-    def __init__(self, config: Dict) -> None:
+    __slots__ = ("config", "_session", "_token", "_api_key", "_version")
+
+    # OAuth tokens shared by all sinks with the monotonic time to refresh
+    # them at, keyed by (api_key, username, oauth_url)
+    _TOKEN_CACHE: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+    _TOKEN_LOCK = threading.Lock()
+    # Refresh tokens this many seconds before they expire (at most half
+    # their lifetime)
+    _TOKEN_EXPIRY_MARGIN = 60
+
+    def __init__(
+        self, config: Dict, session: Optional[requests.Session] = None
+    ) -> None:
         """Initialize the authenticator.
         
         Args:
             config: Configuration dictionary containing credentials
+            session: HTTP session used for token requests, so they can reuse
+                pooled connections
         """
         self.config = config
+        self._session = session or requests.Session()
         self._token = None
         self._api_key = None
+        self._version = 0
 
     @property
     def api_key(self) -> str:
@@ -39,14 +57,49 @@ class VenditAuthenticator:
     @property
     def token(self) -> str:
         """Get the OAuth token, fetching it if necessary."""
-        if self._token is None:
-            # First check if token is provided directly
-            self._token = self.config.get("token")
-            if not self._token:
-                # Try to get token via OAuth
-                self._token = self._get_oauth_token()
+        # A token provided directly in config is used as-is; otherwise the
+        # shared OAuth cache hands out a token and refreshes it near expiry
+        token = self.config.get("token") or self._get_oauth_token()
+        if token != self._token:
+            self._token = token
+            self._version += 1
         return self._token
 
+    @property
+    def version(self) -> int:
+        """Get a counter that changes whenever the token changes."""
+        return self._version
+
+    @property
+    def _oauth_url(self) -> str:
+        """Get the OAuth token endpoint."""
+        return (
+            self.config.get("oauth_url")
+            or "https://oauth.vendit.online/Api/GetToken"
+        )
+
+    @property
+    def _cache_key(self) -> Tuple[str, str, str]:
+        """Get the key of this authenticator's entry in the token cache."""
+        return (self.api_key, self.config.get("username"), self._oauth_url)
+
+    def invalidate_token(self) -> bool:
+        """Drop the current OAuth token so the next use fetches a new one.
+
+        Returns:
+            True if a new token will be fetched, False if the token comes
+            from config and cannot be refreshed
+        """
+        if self.config.get("token"):
+            return False
+        cls = type(self)
+        with cls._TOKEN_LOCK:
+            # Another sink may already have replaced the rejected token
+            cached = cls._TOKEN_CACHE.get(self._cache_key)
+            if cached and cached[0] == self._token:
+                del cls._TOKEN_CACHE[self._cache_key]
+        return True
+
     def _get_oauth_token(self) -> str:
         """Get OAuth token from Vendit API.
         
@@ -58,10 +111,7 @@ class VenditAuthenticator:
         """
         username = self.config.get("username")
         password = self.config.get("password")
-        oauth_url = (
-            self.config.get("oauth_url")
-            or "https://oauth.vendit.online/Api/GetToken"
-        )
+        oauth_url = self._oauth_url
 
         if not username or not password:
             raise ValueError(
@@ -69,23 +119,56 @@ class VenditAuthenticator:
                 "or provide 'username' and 'password' to obtain token via OAuth."
             )
 
-        # Build OAuth URL with credentials as query parameters
-        url = (
-            f"{oauth_url}?"
-            f"apiKey={self.api_key}"
-            f"&username={username}"
-            f"&password={password}"
-        )
+        key = self._cache_key
+        cls = type(self)
+        with cls._TOKEN_LOCK:
+            token, refresh_at = cls._TOKEN_CACHE.get(key, (None, 0.0))
+            if token and time.monotonic() < refresh_at:
+                return token
+
+            token, ttl = self._request_oauth_token(oauth_url, username, password)
+            # Short-lived tokens would always fall inside the full margin,
+            # so never refresh earlier than halfway through their lifetime
+            margin = min(cls._TOKEN_EXPIRY_MARGIN, ttl / 2)
+            cls._TOKEN_CACHE[key] = (token, time.monotonic() + ttl - margin)
+            return token
+
+    def _request_oauth_token(
+        self, oauth_url: str, username: str, password: str
+    ) -> Tuple[str, float]:
+        """Request a new OAuth token from Vendit API.
+
+        Returns:
+            Tuple of token string and its lifetime in seconds
+
+        Raises:
+            ValueError: If the token request fails
+        """
+        # Credentials are sent as query parameters, encoded by requests
+        params = {
+            "apiKey": self.api_key,
+            "username": username,
+            "password": password,
+        }
 
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json",
             "ApiKey": self.api_key,
+            # The shared session carries the current Token as a default
+            # header; None makes requests drop it for the token request
+            "Token": None,
         }
 
         logger.info(f"Getting OAuth token from {oauth_url}")
         try:
-            response = requests.post(url, headers=headers)
+            timeout = (
+                self.config.get("connect_timeout", 5),
+                self.config.get("read_timeout", 60),
+            )
+            response = self._session.post(
+                oauth_url, params=params, headers=headers, timeout=timeout
+            )
             response.raise_for_status()
             token_data = response.json()
 
@@ -95,8 +178,15 @@ class VenditAuthenticator:
                 )
 
             token = token_data["token"]
+            try:
+                ttl = float(token_data.get("expiresIn") or 3600)
+            except (TypeError, ValueError):
+                ttl = 3600.0
+            if not ttl > 0:
+                # Also catches NaN, which compares false to everything
+                ttl = 3600.0
             logger.info("Successfully obtained OAuth token")
-            return token
+            return token, ttl
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to get OAuth token: {e}")
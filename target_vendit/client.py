@@ -1,14 +1,23 @@
 """Vendit target sink base class."""
 
+import gzip
+import weakref
 from typing import Dict, Optional, List
 
 import requests
+from requests.adapters import HTTPAdapter
 from singer_sdk.exceptions import FatalAPIError
 from singer_sdk.plugin_base import PluginBase
 from target_hotglue.client import HotglueSink
+from urllib3.util.retry import Retry
 
+from target_vendit import _json
 from target_vendit.auth import VenditAuthenticator
 
+_SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"})
+# Smaller bodies aren't worth compressing
+_GZIP_MIN_BYTES = 4096
+
 
 class VenditSink(HotglueSink):
     """Vendit target sink base class."""
@@ -23,31 +32,89 @@ class VenditSink(HotglueSink):
         """Initialize target sink."""
         super().__init__(target, stream_name, schema, key_properties)
 
+        # Share one session (and its keep-alive pool) and one authenticator
+        # between all sinks of this target run
+        self._target = target
+        if getattr(target, "_vendit_session", None) is None:
+            target._vendit_session = self._create_session()
+        self._session = target._vendit_session
+        # Sinks using the shared session, the last one to finish closes it.
+        # Weak references, because sinks replaced by a schema change are
+        # dropped by the target without clean_up() being called on them
+        if getattr(target, "_vendit_sinks", None) is None:
+            target._vendit_sinks = weakref.WeakSet()
+        target._vendit_sinks.add(self)
+        self.timeout = (
+            self.config.get("connect_timeout", 5),
+            self.config.get("read_timeout", 60),
+        )
+
+        # The base URL doesn't change during a run
+        api_url = self.config.get("api_url", "https://api2.vendit.online")
+        self._base_url = f"{api_url.rstrip('/')}/VenditPublicApi"
+        # Authenticator token version last put on the session headers
+        self._token_version = -1
+        self._compress_requests = self.config.get("compress_requests", False)
+
         try:
             # Initialize authenticator (lazy - won't fetch token until needed)
-            self._authenticator = VenditAuthenticator(self.config)
+            if getattr(target, "_vendit_auth", None) is None:
+                target._vendit_auth = VenditAuthenticator(self.config, self._session)
+            self._authenticator = target._vendit_auth
         except Exception as e:
             self.logger.warning(f"Failed to initialize authenticator: {e}. Will retry when making requests.")
             self._authenticator = None
         
         self.logger.info(f"Initialized {self.__class__.__name__} sink for stream '{stream_name}'")
 
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a pooled HTTP session with retries for transient errors."""
+        session = requests.Session()
+        # The import PUT is not known to be idempotent, so only retry when
+        # the request cannot have been processed: connection failures and
+        # 429/503 rejections. Read timeouts and 502/504 gateway errors may
+        # come after the server stored the order and are never retried.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=5,
+                read=0,
+                backoff_factor=0.5,
+                status_forcelist=[429, 503],
+                allowed_methods=["GET", "PUT"],
+                raise_on_status=False,
+            ),
+        )
+        session.mount("https://", adapter)
+        return session
+
     @property
     def base_url(self) -> str:
         """Get the base URL for the Vendit API."""
-        api_url = self.config.get("api_url", "https://api2.vendit.online")
-        api_url = api_url.rstrip("/")
-        return f"{api_url}/VenditPublicApi"
+        return self._base_url
 
     @property
     def http_headers(self) -> Dict[str, str]:
         """Get HTTP headers for API requests."""
-        # Initialize authenticator if not already done
+        return self._get_authenticator().get_headers()
+
+    def _get_authenticator(self) -> VenditAuthenticator:
+        """Get the authenticator, creating it if initialization failed before."""
         if self._authenticator is None:
-            self._authenticator = VenditAuthenticator(self.config)
-        
-        # Get headers from authenticator
-        return self._authenticator.get_headers()
+            self._target._vendit_auth = VenditAuthenticator(self.config, self._session)
+            self._authenticator = self._target._vendit_auth
+        return self._authenticator
+
+    def _update_session_headers(self) -> None:
+        """Put the current auth headers on the session if the token changed."""
+        authenticator = self._get_authenticator()
+        # Reading the token fetches or refreshes it and bumps the version
+        authenticator.token
+        if authenticator.version != self._token_version:
+            self._session.headers.update(authenticator.get_headers())
+            self._token_version = authenticator.version
 
     def preprocess_record(self, record: dict, context: dict) -> dict:
         """Preprocess record before sending."""
@@ -74,31 +141,54 @@ class VenditSink(HotglueSink):
         headers: Optional[Dict] = None,
     ) -> requests.Response:
         """Make an API request with correct URL construction for Vendit API."""
+        method = method.upper()
+        if method not in _SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
         # Ensure endpoint doesn't have leading slash to avoid double slashes
         endpoint = endpoint.lstrip("/")
         # Construct full URL: base_url already includes /VenditPublicApi
         full_url = f"{self.base_url}/{endpoint}"
         
-        # Get headers (merge with any provided headers)
-        request_headers = self.http_headers.copy()
-        if headers:
-            request_headers.update(headers)
-        
-        # Make the request directly to ensure correct URL
+        # Encode the body once ourselves instead of letting requests dump
+        # it to a str and then encode that to bytes
         try:
-            if method.upper() == "GET":
-                response = requests.get(full_url, params=params, headers=request_headers, json=request_data)
-            elif method.upper() == "POST":
-                response = requests.post(full_url, params=params, headers=request_headers, json=request_data)
-            elif method.upper() == "PUT":
-                response = requests.put(full_url, params=params, headers=request_headers, json=request_data)
-            elif method.upper() == "PATCH":
-                response = requests.patch(full_url, params=params, headers=request_headers, json=request_data)
-            elif method.upper() == "DELETE":
-                response = requests.delete(full_url, params=params, headers=request_headers, json=request_data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
+            body = _json.dumps(request_data) if request_data is not None else None
+        except (TypeError, ValueError) as e:
+            raise FatalAPIError(f"Could not encode request to {full_url}: {e}") from e
+        if (
+            body is not None
+            and self._compress_requests
+            and len(body) > _GZIP_MIN_BYTES
+        ):
+            body = gzip.compress(body, compresslevel=1)
+            headers = {**(headers or {}), "Content-Encoding": "gzip"}
+
+        # Make the request through the shared session to reuse connections
+        try:
+            for attempt in range(2):
+                # Auth headers are session defaults that requests merges in,
+                # so only caller overrides are passed per request
+                self._update_session_headers()
+                response = self._session.request(
+                    method,
+                    full_url,
+                    params=params,
+                    headers=headers,
+                    data=body,
+                    timeout=self.timeout,
+                )
+
+                # An expired token is refreshed once instead of failing the record
+                if (
+                    response.status_code == 401
+                    and attempt == 0
+                    and self._authenticator.invalidate_token()
+                ):
+                    self.logger.info("Vendit API rejected the token, refreshing it and retrying")
+                    continue
+                break
+
             # Validate response (this will raise FatalAPIError if needed)
             self.validate_response(response)
             
@@ -107,8 +197,38 @@ class VenditSink(HotglueSink):
         except requests.exceptions.RequestException as e:
             raise FatalAPIError(f"Request to {full_url} failed: {e}") from e
 
+    def _response_id(self, response: requests.Response, record: dict) -> Optional[str]:
+        """Get the id of an imported record from the Vendit response.
+
+        Falls back to the optiplyId of the record's first item when the
+        response has no id.
+        """
+        response_id = None
+        if response.status_code in [200, 201, 204]:
+            # A 204 or empty body has no id to read
+            if response.status_code != 204 and response.content:
+                try:
+                    response_id = _json.loads(response.content).get("id")
+                # ValueError covers JSONDecodeError and non-UTF-8 bodies
+                except (ValueError, AttributeError):
+                    pass
+
+            if not response_id and record.get("items"):
+                response_id = record["items"][0].get("optiplyId")
+        return response_id
+
+    def clean_up(self) -> None:
+        """Close the shared session once the last sink using it is done."""
+        super().clean_up()
+        sinks = self._target._vendit_sinks
+        sinks.discard(self)
+        if not sinks and self._target._vendit_session is self._session:
+            self._session.close()
+            # Sinks created later start with a fresh session and authenticator
+            self._target._vendit_session = None
+            self._target._vendit_auth = None
+
     def validate_response(self, response: requests.Response) -> None:
         """Validate API response and raise FatalAPIError if needed."""
         # Call parent's validate_response which will raise FatalAPIError if needed
         super().validate_response(response)
-
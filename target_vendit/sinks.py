@@ -1,11 +1,42 @@
 """Vendit target sink classes, which handle writing streams."""
 
 import json
-from datetime import datetime, timezone
 
 from singer_sdk.exceptions import FatalAPIError
+from target_vendit import _json
+from target_vendit._dt import normalize_creation_datetime
 from target_vendit.client import VenditSink
 
+# Accepted source field names, in order of preference
+_PRODUCT_ID_KEYS = ("productId", "product_id", "product_remoteId")
+_AMOUNT_KEYS = ("amount", "quantity", "qty")
+_CREATION_DATETIME_KEYS = (
+    "creationDatetime",
+    "creation_datetime",
+    "transaction_date",
+    "created_at",
+)
+_OPTIPLY_ID_KEYS = ("optiplyId", "optiply_id", "id")
+_TARGET_SUPPLIER_ID_KEYS = (
+    "targetSupplierId",
+    "target_supplier_id",
+    "supplier_remoteId",
+)
+
+
+def _first_truthy(record, keys):
+    """Return the first truthy value of the given keys in a record."""
+    for key in keys:
+        value = record.get(key)
+        if value:
+            return value
+    return None
+
+
+def _as_int(value):
+    """Convert a value to int, skipping the conversion for ints."""
+    return value if type(value) is int else int(value)
+
 
 def _first_present(*values):
     """Return the first value that is not None or empty string."""
@@ -30,99 +61,47 @@ class PrePurchaseOrders(VenditSink):
 
     def preprocess_record(self, record: dict, context: dict) -> dict:
         """Build the payload for PrePurchaseOrders."""
+        # Bind hot attribute lookups to locals once per record
+        get = record.get
+        logger = self.logger
+
         # If this has line_items, it's actually a BuyOrders record - skip it
         # (BuyOrders sink will handle it)
-        if "line_items" in record and record.get("line_items"):
+        if get("line_items"):
             return None
-        
-        items = []
 
         # Get productId
-        product_id = (
-            record.get("productId")
-            or record.get("product_id")
-            or record.get("product_remoteId")
-        )
+        product_id = _first_truthy(record, _PRODUCT_ID_KEYS)
         if not product_id:
-            self.logger.info("Skipping record with no productId")
+            logger.info("Skipping record with no productId")
             return None
 
         # Get amount/quantity
-        amount = (
-            record.get("amount")
-            or record.get("quantity")
-            or record.get("qty")
-        )
+        amount = _first_truthy(record, _AMOUNT_KEYS)
         if not amount:
-            self.logger.info("Skipping record with no amount/quantity")
+            logger.info("Skipping record with no amount/quantity")
             return None
 
         # Get creationDatetime
-        creation_datetime = (
-            record.get("creationDatetime")
-            or record.get("creation_datetime")
-            or record.get("transaction_date")
-            or record.get("created_at")
-        )
+        creation_datetime = _first_truthy(record, _CREATION_DATETIME_KEYS)
         
         # Normalize datetime to API format: "2025-08-18T13:35:51.885Z"
-        if isinstance(creation_datetime, datetime):
-            # Convert datetime to UTC and format with milliseconds
-            if creation_datetime.tzinfo:
-                creation_datetime = creation_datetime.astimezone(timezone.utc).replace(tzinfo=None)
-            creation_datetime = creation_datetime.isoformat(timespec='milliseconds') + "Z"
-        elif isinstance(creation_datetime, str):
-            # Parse string datetime and normalize to API format
-            try:
-                # Try parsing with fromisoformat first (handles most ISO formats)
-                dt = datetime.fromisoformat(creation_datetime.replace('Z', '+00:00'))
-                # Convert to UTC if timezone-aware, then format with milliseconds
-                if dt.tzinfo:
-                    dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-                creation_datetime = dt.isoformat(timespec='milliseconds') + "Z"
-            except (ValueError, AttributeError):
-                # Fallback: try manual parsing
-                try:
-                    # Clean up the string - remove trailing Z, handle timezone
-                    dt_str = creation_datetime.replace('Z', '').strip()
-                    # Remove timezone offset if present
-                    if '+' in dt_str:
-                        dt_str = dt_str.split('+')[0]
-                    elif dt_str.count('-') > 2:  # Has timezone like -05:00
-                        parts = dt_str.rsplit('-', 2)
-                        if len(parts) == 3 and ':' in parts[2]:
-                            dt_str = '-'.join(parts[:2])
-                    # Replace space with T if needed for ISO format
-                    if ' ' in dt_str and 'T' not in dt_str:
-                        dt_str = dt_str.replace(' ', 'T')
-                    # Parse ISO format
-                    dt = datetime.fromisoformat(dt_str)
-                    # Convert to UTC and format with milliseconds
-                    creation_datetime = dt.isoformat(timespec='milliseconds') + "Z"
-                except Exception as e:
-                    self.logger.warning(f"Failed to parse creationDatetime '{creation_datetime}': {e}, using current time")
-                    creation_datetime = datetime.utcnow().isoformat(timespec='milliseconds') + "Z"
-        elif not creation_datetime:
-            creation_datetime = datetime.utcnow().isoformat(timespec='milliseconds') + "Z"
+        creation_datetime = normalize_creation_datetime(creation_datetime, logger)
 
         # Get optiplyId
-        optiply_id = (
-            record.get("optiplyId")
-            or record.get("optiply_id")
-            or record.get("id")
-        )
+        optiply_id = _first_truthy(record, _OPTIPLY_ID_KEYS)
 
         item = {
-            "productId": int(product_id),
-            "amount": int(amount),
+            "productId": _as_int(product_id),
+            "amount": _as_int(amount),
             "creationDatetime": creation_datetime,
         }
 
         price = _coerce_price(
             _first_present(
-                record.get("unit_price"),
-                record.get("price"),
-                record.get("purchase_price"),
+                get("unit_price"),
+                get("price"),
+                get("purchase_price"),
             )
         )
         if price is not None:
@@ -132,9 +111,7 @@ class PrePurchaseOrders(VenditSink):
             item["optiplyId"] = str(optiply_id)
             item["orderReference"] = str(optiply_id)
 
-        items.append(item)
-
-        return {"items": items}
+        return {"items": [item]}
 
     def upsert_record(self, record: dict, context: dict):
         """Send the record to Vendit API."""
@@ -149,20 +126,7 @@ class PrePurchaseOrders(VenditSink):
             request_data=record
         )
 
-        # Extract response ID
-        response_id = None
-        if response.status_code in [200, 201, 204]:
-            try:
-                response_data = response.json()
-                response_id = response_data.get("id")
-            except (json.JSONDecodeError, AttributeError):
-                pass
-
-            # Fallback to optiplyId from first item
-            if not response_id and record.get("items") and len(record["items"]) > 0:
-                response_id = record["items"][0].get("optiplyId")
-
-        return response_id, True, state_updates
+        return self._response_id(response, record), True, state_updates
 
 
 class BuyOrders(VenditSink):
@@ -172,117 +136,85 @@ class BuyOrders(VenditSink):
     name = "BuyOrders"
 
     def process_record(self, record: dict, context: dict) -> None:
-        """Process a record by splitting line_items and sending each as a separate request."""
-        # If record already has 'items' (single item), process it directly
+        """Process a record by sending all of its line_items in one import request."""
+        # If record already has 'items', process it directly
         if "items" in record and "line_items" not in record:
             super().process_record(record, context)
             return
         
-        # Parse and split line_items into individual requests
+        # Parse line_items
         line_items = record.get("line_items")
         
         if line_items is None:
             self.logger.info(f"Skipping order with no line_items field. Record keys: {list(record.keys())}")
             return
         
-        # Parse if it's a string
-        if isinstance(line_items, str):
-            if not line_items.strip():
-                return
-            try:
-                line_items = json.loads(line_items)
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Failed to parse line_items JSON: {e}")
-                return
+        # Structured arrays (the preferred input) need no parsing or wrapping
+        if type(line_items) is not list:
+            # Parse if it's a string
+            if isinstance(line_items, str):
+                if not line_items.strip():
+                    return
+                try:
+                    line_items = _json.loads(line_items)
+                except json.JSONDecodeError as e:
+                    self.logger.error(f"Failed to parse line_items JSON: {e}")
+                    return
+
+            # Ensure line_items is a list
+            if line_items and not isinstance(line_items, list):
+                line_items = [line_items]
 
         # Check if line_items is empty after parsing
-        if not line_items or (isinstance(line_items, list) and len(line_items) == 0):
+        if not line_items:
             self.logger.info(f"Skipping order with empty line_items after parsing")
             return
 
-        # Ensure line_items is a list
-        if not isinstance(line_items, list):
-            line_items = [line_items]
-
         # Get creationDatetime from buy order
-        creation_datetime = (
-            record.get("creationDatetime")
-            or record.get("creation_datetime")
-            or record.get("transaction_date")
-            or record.get("created_at")
-        )
+        creation_datetime = _first_truthy(record, _CREATION_DATETIME_KEYS)
         
         # Normalize datetime to API format
-        if isinstance(creation_datetime, datetime):
-            if creation_datetime.tzinfo:
-                creation_datetime = creation_datetime.astimezone(timezone.utc).replace(tzinfo=None)
-            creation_datetime = creation_datetime.isoformat(timespec='milliseconds') + "Z"
-        elif isinstance(creation_datetime, str):
-            try:
-                dt = datetime.fromisoformat(creation_datetime.replace('Z', '+00:00'))
-                if dt.tzinfo:
-                    dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-                creation_datetime = dt.isoformat(timespec='milliseconds') + "Z"
-            except (ValueError, AttributeError):
-                try:
-                    dt_str = creation_datetime.replace('Z', '').strip()
-                    if '+' in dt_str:
-                        dt_str = dt_str.split('+')[0]
-                    elif dt_str.count('-') > 2:
-                        parts = dt_str.rsplit('-', 2)
-                        if len(parts) == 3 and ':' in parts[2]:
-                            dt_str = '-'.join(parts[:2])
-                    if ' ' in dt_str and 'T' not in dt_str:
-                        dt_str = dt_str.replace(' ', 'T')
-                    dt = datetime.fromisoformat(dt_str)
-                    creation_datetime = dt.isoformat(timespec='milliseconds') + "Z"
-                except Exception as e:
-                    self.logger.warning(f"Failed to parse creationDatetime '{creation_datetime}': {e}, using current time")
-                    creation_datetime = datetime.utcnow().isoformat(timespec='milliseconds') + "Z"
-        elif not creation_datetime:
-            creation_datetime = datetime.utcnow().isoformat(timespec='milliseconds') + "Z"
+        creation_datetime = normalize_creation_datetime(creation_datetime, self.logger)
 
         # Get optiplyId from buy order
-        optiply_id = (
-            record.get("optiplyId")
-            or record.get("optiply_id")
-            or record.get("id")
-        )
+        optiply_id = _first_truthy(record, _OPTIPLY_ID_KEYS)
+
+        # Fields shared by every line item of the buy order
+        order_fields = {"creationDatetime": creation_datetime}
+        if optiply_id:
+            optiply_id = str(optiply_id)
+            order_fields["optiplyId"] = optiply_id
+            order_fields["orderReference"] = optiply_id
+
+        # Add office ID if configured (default warehouse for buy order export)
+        office_id = self.config.get("default_export_buyOrder_warehouseId")
+        if office_id is not None:
+            order_fields["officeId"] = _as_int(office_id)
 
         # Get target supplier ID from buy order
-        target_supplier_id = (
-            record.get("targetSupplierId")
-            or record.get("target_supplier_id")
-            or record.get("supplier_remoteId")
-        )
+        target_supplier_id = _first_truthy(record, _TARGET_SUPPLIER_ID_KEYS)
+        if target_supplier_id:
+            order_fields["targetSupplierId"] = _as_int(target_supplier_id)
 
-        # Process each line item as a separate request
+        # Collect every valid line item into a single import request
+        items = []
         for line_item in line_items:
             # Get productId
-            product_id = (
-                line_item.get("productId")
-                or line_item.get("product_id")
-                or line_item.get("product_remoteId")
-            )
+            product_id = _first_truthy(line_item, _PRODUCT_ID_KEYS)
             if not product_id:
                 self.logger.warning(f"Line item missing productId, skipping: {line_item}")
                 continue
 
             # Get amount/quantity
-            amount = (
-                line_item.get("amount")
-                or line_item.get("quantity")
-                or line_item.get("qty")
-            )
+            amount = _first_truthy(line_item, _AMOUNT_KEYS)
             if not amount:
                 self.logger.warning(f"Line item missing amount/quantity, skipping: {line_item}")
                 continue
 
-            # Create payload with single item
             item = {
-                "productId": int(product_id),
-                "amount": int(amount),
-                "creationDatetime": creation_datetime,
+                "productId": _as_int(product_id),
+                "amount": _as_int(amount),
+                **order_fields,
             }
 
             price = _coerce_price(
@@ -295,22 +227,13 @@ class BuyOrders(VenditSink):
             if price is not None:
                 item["purchasePriceEx"] = price
 
-            if optiply_id:
-                item["optiplyId"] = str(optiply_id)
-                item["orderReference"] = str(optiply_id)
-
-            # Add target supplier ID
-            if target_supplier_id:
-                item["targetSupplierId"] = int(target_supplier_id)
+            items.append(item)
 
-            # Add office ID if configured (default warehouse for buy order export)
-            office_id = self.config.get("default_export_buyOrder_warehouseId")
-            if office_id is not None:
-                item["officeId"] = int(office_id)
+        if not items:
+            self.logger.info("Skipping order with no valid line_items")
+            return
 
-            # Send each line item as a separate request
-            single_item_payload = {"items": [item]}
-            super().process_record(single_item_payload, context)
+        super().process_record({"items": items}, context)
 
     def upsert_record(self, record: dict, context: dict):
         """Send the record to Vendit API."""
@@ -326,20 +249,7 @@ class BuyOrders(VenditSink):
                 request_data=record
             )
 
-            # Extract response ID
-            response_id = None
-            if response.status_code in [200, 201, 204]:
-                try:
-                    response_data = response.json()
-                    response_id = response_data.get("id")
-                except (json.JSONDecodeError, AttributeError):
-                    pass
-
-                # Fallback to optiplyId from first item
-                if not response_id and record.get("items") and len(record["items"]) > 0:
-                    response_id = record["items"][0].get("optiplyId")
-
-            return response_id, True, state_updates
+            return self._response_id(response, record), True, state_updates
             
         except FatalAPIError as e:
             state_updates["error"] = str(e)
@@ -350,9 +260,9 @@ class BuyOrders(VenditSink):
             return None, False, state_updates
 
     def preprocess_record(self, record: dict, context: dict) -> dict:
-        """Preprocess record - returns as-is since process_record handles splitting."""
+        """Preprocess record - returns as-is since process_record builds the items."""
         # If record already has 'items', return as-is (already processed)
         if "items" in record and "line_items" not in record:
             return record
-        # Otherwise return as-is - process_record will handle the splitting
+        # Otherwise return as-is - process_record will build the items
         return record
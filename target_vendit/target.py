@@ -22,6 +22,9 @@ class TargetVendit(TargetHotglue):
         th.Property("username", th.StringType, required=False),
         th.Property("password", th.StringType, required=False),
         th.Property("oauth_url", th.StringType, required=False),
+        th.Property("connect_timeout", th.NumberType, default=5),
+        th.Property("read_timeout", th.NumberType, default=60),
+        th.Property("compress_requests", th.BooleanType, default=False),
     ).to_dict()
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from target_vendit import auth  # noqa: E402
+
+
+@pytest.fixture
+def oauth_tokens(request, monkeypatch):
+    """Stub OAuth token requests with an empty token cache.
+
+    Tokens are numbered "token-1", "token-2", ... and live for 3600 seconds,
+    or for the TTL passed through indirect parametrization. The returned
+    list records the username of every token request.
+    """
+    ttl = getattr(request, "param", 3600)
+    calls = []
+
+    def fake_request(self, oauth_url, username, password):
+        calls.append(username)
+        return f"token-{len(calls)}", ttl
+
+    monkeypatch.setattr(auth.VenditAuthenticator, "_TOKEN_CACHE", {})
+    monkeypatch.setattr(
+        auth.VenditAuthenticator, "_request_oauth_token", fake_request
+    )
+    return calls
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from target_vendit import auth
+
+
+CONFIG = {"api_key": "key", "username": "user", "password": "secret"}
+
+
+def test_oauth_token_is_shared_between_authenticators(oauth_tokens):
+    first = auth.VenditAuthenticator(dict(CONFIG))
+    second = auth.VenditAuthenticator(dict(CONFIG))
+
+    assert first.token == "token-1"
+    assert second.token == "token-1"
+    assert oauth_tokens == ["user"]
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_oauth_token_is_refetched_near_expiry(oauth_tokens, monkeypatch):
+    clock = _Clock(1000.0)
+    monkeypatch.setattr(auth.time, "monotonic", clock)
+    authenticator = auth.VenditAuthenticator(dict(CONFIG))
+
+    assert authenticator.token == "token-1"
+    clock.now += 3600 - 61
+    assert authenticator.token == "token-1"
+    clock.now += 2
+    assert authenticator.token == "token-2"
+
+
+@pytest.mark.parametrize("oauth_tokens", [30], indirect=True)
+def test_short_lived_oauth_token_is_cached_for_half_its_lifetime(
+    oauth_tokens, monkeypatch
+):
+    clock = _Clock(1000.0)
+    monkeypatch.setattr(auth.time, "monotonic", clock)
+    authenticator = auth.VenditAuthenticator(dict(CONFIG))
+
+    assert [authenticator.token for _ in range(5)] == ["token-1"] * 5
+    clock.now += 14
+    assert authenticator.token == "token-1"
+    clock.now += 2
+    assert authenticator.token == "token-2"
+    assert oauth_tokens == ["user", "user"]
+
+
+def test_invalidate_token_fetches_a_new_oauth_token(oauth_tokens):
+    authenticator = auth.VenditAuthenticator(dict(CONFIG))
+
+    assert authenticator.token == "token-1"
+    assert authenticator.invalidate_token() is True
+    assert authenticator.token == "token-2"
+
+
+def test_invalidate_token_is_a_noop_for_configured_tokens():
+    authenticator = auth.VenditAuthenticator({"api_key": "key", "token": "fixed"})
+
+    assert authenticator.invalidate_token() is False
+    assert authenticator.token == "fixed"
+
+
+def _session_answering(body, sent):
+    """Build a session that records requests and answers them with body."""
+    requests = auth.requests
+    session = requests.Session()
+
+    def fake_send(request, **kwargs):
+        sent.append(request)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        return response
+
+    session.send = fake_send
+    return session
+
+
+def test_oauth_request_drops_the_sessions_token_header():
+    sent = []
+    session = _session_answering(b'{"token": "fresh"}', sent)
+    session.headers["Token"] = "stale"
+    authenticator = auth.VenditAuthenticator(dict(CONFIG), session)
+
+    token, _ = authenticator._request_oauth_token(
+        "https://oauth.example.com/Api/GetToken", "user", "secret"
+    )
+
+    assert token == "fresh"
+    assert "Token" not in sent[0].headers
+    assert sent[0].headers["ApiKey"] == "key"
+
+
+@pytest.mark.parametrize("expires_in", ["soon", None, 0, -5, "nan"])
+def test_oauth_request_falls_back_to_an_hour_for_unusable_expires_in(expires_in):
+    body = json.dumps({"token": "fresh", "expiresIn": expires_in}).encode()
+    session = _session_answering(body, [])
+    authenticator = auth.VenditAuthenticator(dict(CONFIG), session)
+
+    token, ttl = authenticator._request_oauth_token(
+        "https://oauth.example.com/Api/GetToken", "user", "secret"
+    )
+
+    assert (token, ttl) == ("fresh", 3600)
@@ -59,8 +59,10 @@ def test_buy_orders_maps_line_item_unit_price_to_vendit_purchase_price_ex():
         {},
     )
 
-    assert [payload["items"][0]["purchasePriceEx"] for payload in sink.payloads] == [145.0, 3.5]
-    assert sink.payloads[0]["items"][0]["targetSupplierId"] == 456
+    assert len(sink.payloads) == 1
+    items = sink.payloads[0]["items"]
+    assert [item["purchasePriceEx"] for item in items] == [145.0, 3.5]
+    assert [item["targetSupplierId"] for item in items] == [456, 456]
 
 
 def test_pre_purchase_orders_maps_unit_price_to_vendit_purchase_price_ex():
@@ -77,3 +79,31 @@ def test_pre_purchase_orders_maps_unit_price_to_vendit_purchase_price_ex():
     )
 
     assert payload["items"][0]["purchasePriceEx"] == 0.0
+
+
+def test_buy_orders_parses_line_items_json_string():
+    sink = sinks.BuyOrders()
+    sink.process_record(
+        {
+            "id": "bo-124",
+            "creationDatetime": "2026-05-13T10:15:00Z",
+            "line_items": '[{"productId": 27043329, "quantity": 2, "unit_price": 1.25}]',
+        },
+        {},
+    )
+
+    assert sink.payloads == [
+        {
+            "items": [
+                {
+                    "productId": 27043329,
+                    "amount": 2,
+                    "creationDatetime": "2026-05-13T10:15:00.000Z",
+                    "optiplyId": "bo-124",
+                    "orderReference": "bo-124",
+                    "purchasePriceEx": 1.25,
+                }
+            ]
+        }
+    ]
+
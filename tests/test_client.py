@@ -0,0 +1,226 @@
+import gc
+import gzip
+import importlib.util
+import json
+import logging
+import sys
+import types
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _FakeHotglueSink:
+    def __init__(self, target, stream_name, schema, key_properties):
+        self.config = target.config
+        self.logger = logging.getLogger(__name__)
+
+    def validate_response(self, response):
+        pass
+
+    def clean_up(self):
+        pass
+
+
+FatalAPIError = type("FatalAPIError", (Exception,), {})
+
+
+def _stub_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+_stub_module("singer_sdk")
+_stub_module("singer_sdk.exceptions", FatalAPIError=FatalAPIError)
+_stub_module("singer_sdk.plugin_base", PluginBase=object)
+_stub_module("target_hotglue")
+_stub_module("target_hotglue.client", HotglueSink=_FakeHotglueSink)
+
+# Load the real client under its own name, other tests replace
+# target_vendit.client with a fake
+_spec = importlib.util.spec_from_file_location(
+    "_target_vendit_client_under_test", ROOT / "target_vendit" / "client.py"
+)
+client = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(client)
+
+
+class _Target:
+    def __init__(self, config):
+        self.config = config
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class _FakeSession:
+    """Records requests and answers them with the given status codes."""
+
+    def __init__(self, session, status_codes):
+        self.session = session
+        self.status_codes = list(status_codes)
+        self.calls = []
+
+    def request(self, method, url, params=None, headers=None, data=None, timeout=None):
+        self.calls.append(
+            {
+                "method": method,
+                "session_headers": dict(self.session.headers),
+                "headers": headers,
+                "data": data,
+            }
+        )
+        return _Response(self.status_codes.pop(0))
+
+
+def _make_sink(config, status_codes):
+    sink = client.VenditSink(_Target(config), "BuyOrders", {}, None)
+    fake = _FakeSession(sink._session, status_codes)
+    sink._session.request = fake.request
+    return sink, fake
+
+
+OAUTH_CONFIG = {"api_key": "key", "username": "user", "password": "secret"}
+
+
+def test_request_api_encodes_decimal_fields():
+    sink, fake = _make_sink({"api_key": "key", "token": "fixed"}, [200])
+
+    sink.request_api("PUT", "PrePurchaseOrders/Import", request_data={"price": Decimal("1.5")})
+
+    assert json.loads(fake.calls[0]["data"]) == {"price": 1.5}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), Decimal("NaN")])
+def test_request_api_wraps_unencodable_bodies_in_fatal_api_error(
+    use_orjson, value, monkeypatch
+):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(client._json, "orjson", None)
+    sink, fake = _make_sink({"api_key": "key", "token": "fixed"}, [200])
+
+    with pytest.raises(FatalAPIError):
+        sink.request_api("PUT", "PrePurchaseOrders/Import", request_data={"price": value})
+    assert fake.calls == []
+
+
+class _BodyResponse:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+@pytest.mark.parametrize(
+    "status_code, content, expected",
+    [
+        (200, b'{"id": "vendit-1"}', "vendit-1"),
+        (204, b"", "bo-125"),
+        (200, b"OK \xe9t\xe9", "bo-125"),
+        (200, b"[]", "bo-125"),
+        (500, b'{"id": "vendit-1"}', None),
+    ],
+)
+def test_response_id_falls_back_to_the_first_items_optiply_id(
+    status_code, content, expected, monkeypatch
+):
+    # Exercise the stdlib decoder, which raises UnicodeDecodeError on bytes
+    monkeypatch.setattr(client._json, "orjson", None)
+    sink, _ = _make_sink({"api_key": "key", "token": "fixed"}, [])
+    record = {"items": [{"productId": 1, "amount": 1, "optiplyId": "bo-125"}]}
+
+    assert sink._response_id(_BodyResponse(status_code, content), record) == expected
+
+
+def test_session_never_retries_after_the_request_may_have_been_processed():
+    retry = client.VenditSink._create_session().get_adapter("https://").max_retries
+
+    assert retry.read == 0
+    assert set(retry.status_forcelist) == {429, 503}
+
+
+def test_request_api_retries_401_once_with_a_refreshed_token(oauth_tokens):
+    sink, fake = _make_sink(dict(OAUTH_CONFIG), [401, 200])
+
+    response = sink.request_api("PUT", "PrePurchaseOrders/Import", request_data={"items": []})
+
+    assert response.status_code == 200
+    assert [call["session_headers"]["Token"] for call in fake.calls] == ["token-1", "token-2"]
+    assert oauth_tokens == ["user", "user"]
+
+
+def test_request_api_does_not_retry_401_with_a_configured_token():
+    sink, fake = _make_sink({"api_key": "key", "token": "fixed"}, [401, 200])
+
+    response = sink.request_api("PUT", "PrePurchaseOrders/Import", request_data={"items": []})
+
+    assert response.status_code == 401
+    assert len(fake.calls) == 1
+
+
+def test_request_api_puts_auth_headers_on_the_session():
+    sink, fake = _make_sink({"api_key": "key", "token": "fixed"}, [200])
+
+    sink.request_api("PUT", "PrePurchaseOrders/Import", request_data={"items": []})
+
+    call = fake.calls[0]
+    assert call["session_headers"]["Token"] == "fixed"
+    assert call["session_headers"]["ApiKey"] == "key"
+    assert call["headers"] is None
+
+
+def test_request_api_gzips_large_bodies_when_enabled():
+    config = {"api_key": "key", "token": "fixed", "compress_requests": True}
+    sink, fake = _make_sink(config, [200, 200])
+    large = {"items": [{"note": "x" * client._GZIP_MIN_BYTES}]}
+
+    sink.request_api("PUT", "PrePurchaseOrders/Import", request_data=large)
+    sink.request_api("PUT", "PrePurchaseOrders/Import", request_data={"items": []})
+
+    compressed, small = fake.calls
+    assert compressed["headers"] == {"Content-Encoding": "gzip"}
+    assert json.loads(gzip.decompress(compressed["data"])) == large
+    assert small["headers"] is None
+    assert json.loads(small["data"]) == {"items": []}
+
+
+def test_clean_up_closes_the_shared_session_after_the_last_sink():
+    target = _Target({"api_key": "key", "token": "fixed"})
+    first = client.VenditSink(target, "BuyOrders", {}, None)
+    second = client.VenditSink(target, "PrePurchaseOrders", {}, None)
+    closed = []
+    first._session.close = lambda: closed.append(True)
+
+    first.clean_up()
+    assert closed == []
+    assert target._vendit_session is second._session
+
+    second.clean_up()
+    assert closed == [True]
+    assert target._vendit_session is None
+
+
+def test_clean_up_closes_the_shared_session_when_a_replaced_sink_was_dropped():
+    target = _Target({"api_key": "key", "token": "fixed"})
+    replaced = client.VenditSink(target, "BuyOrders", {}, None)
+    active = client.VenditSink(target, "BuyOrders", {}, None)
+    closed = []
+    active._session.close = lambda: closed.append(True)
+
+    # The target drops a sink replaced by a schema change without cleaning it up
+    del replaced
+    gc.collect()
+    active.clean_up()
+
+    assert closed == [True]
+    assert len(target._vendit_sinks) == 0
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from target_vendit import _dt
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("2025-08-18T13:35:51.885Z", "2025-08-18T13:35:51.885Z"),
+        ("2026-05-13T10:15:00Z", "2026-05-13T10:15:00.000Z"),
+        ("2026-05-13T12:15:00+02:00", "2026-05-13T10:15:00.000Z"),
+        ("2026-05-13 10:15:00", "2026-05-13T10:15:00.000Z"),
+        ("2026-05-13T10:15:00.123+0200", "2026-05-13T08:15:00.123Z"),
+        ("2026-05-13T10:15:00.12Z", "2026-05-13T10:15:00.120Z"),
+    ],
+)
+def test_normalize_iso_ms(raw, expected):
+    assert _dt.normalize_iso_ms(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "not a date",
+        "2025-02-30T00:00:00.000Z",
+        "\u0662\u0660\u0662\u0665-08-18T13:35:51.885Z",
+    ],
+)
+def test_normalize_iso_ms_rejects_invalid_dates(raw):
+    with pytest.raises(ValueError):
+        _dt.normalize_iso_ms(raw)
+
+
+def test_datetime_to_iso_ms_converts_to_utc():
+    value = datetime(2026, 5, 13, 12, 15, tzinfo=timezone(timedelta(hours=2)))
+
+    assert _dt.datetime_to_iso_ms(value) == "2026-05-13T10:15:00.000Z"
+
+
+class _Logger:
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+
+def test_normalize_creation_datetime_falls_back_to_now_on_garbage():
+    logger = _Logger()
+
+    result = _dt.normalize_creation_datetime("not a date", logger)
+
+    assert _dt._is_api_datetime(result)
+    assert len(logger.warnings) == 1